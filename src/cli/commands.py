@@ -6,10 +6,16 @@
 """
 
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 import click
-from ..utils.screenshot import get_screenshot
-from ..models.client import create_client
+
+# pyautogui、openai 以及 asyncio 等模块的导入开销较大,推迟到实际需要的分支中再导入
+# pylint: disable=import-outside-toplevel
+if TYPE_CHECKING:
+    from ..models.client import AIClient
+
+# 批量模式的最大并发请求数,HTTP/2 下所有请求共用一个连接,连接数限制不起作用
+_BATCH_CONCURRENCY = 8
 
 
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
@@ -18,12 +24,23 @@ from ..models.client import create_client
 @click.option("-p", "--path", help="要分析的图片路径")
 @click.option("--prompt", help="更改AI的系统提示词，适用于文本对话和图像分析")
 @click.option("--start", help="更改交互式模式的开场白")
-def cli(
+@click.option(
+    "-s", "--save", help="将屏幕截图保存到指定路径，格式由扩展名决定，仅适用于 -i"
+)
+@click.option(
+    "-b",
+    "--batch",
+    type=click.Path(exists=True, dir_okay=False),
+    help="批量处理文件中的提示词，每行一条，并发发送",
+)
+def cli(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     text: Optional[str],
     image: bool,
     path: Optional[str],
     prompt: Optional[str],
     start: Optional[str],
+    save: Optional[str],
+    batch: Optional[str],
 ):
     """
     AI命令行工具 - AI聊天和图像分析。
@@ -35,33 +52,29 @@ def cli(
         ag -t "请介绍一下自己"          # 文本对话 \n
         ag -i                         # 分析屏幕截图 \n
         ag -p /path/to/image.png      # 分析指定图片 \n
+        ag -b prompts.txt             # 并发处理文件中的多条提示词 \n
         ag -t "描述这张图" -i           # 带提示的截图分析 \n
+        ag -i -s shot.jpg             # 分析屏幕截图并保存截图 \n
         ag                            # 进入交互式模式 \n
         ag --prompt "你是一个医学专家"   # 设置交互式模式的 Prompt \n
         ag --start "你好，我是AI助手"    # 设置交互式模式的开场白 \n
         ag -h, --help                 # 显示帮助信息
     """
+    if save and (path or not image):
+        click.echo("错误: --save 仅适用于屏幕截图分析 (-i),不能与 --path 同时使用")
+        return
+
     try:
         if image or path:
             # 图像分析模式
-            image_prompt = text if text else "请描述并分析这张图片中的内容"
-            image_path = path if path else get_screenshot()
-            system_prompt = prompt if prompt else "你是一个擅长分析图像的助手。"
-
-            if not os.path.exists(image_path):
-                click.echo(f"错误: 图片文件不存在: {image_path}")
-                return
-
-            click.echo(f"正在分析图片: {image_path}")
-            client = create_client()
-            client.image_text_completion(
-                prompt=image_prompt,
-                image_path=image_path,
-                system_prompt=system_prompt,
-                print_output=True,
-            )
+            _analyze_image(text, path, prompt, save)
+        elif batch:
+            # 批量模式
+            _process_batch(batch, prompt)
         elif text:
             # 文本对话模式
+            from ..models.client import create_client
+
             system_prompt = prompt if prompt else "你是一个智能AI助手。"
             client = create_client()
             client.text_completion(
@@ -69,21 +82,7 @@ def cli(
             )
         else:
             # 交互式模式
-            welcome_message = (
-                start
-                if start
-                else "欢迎使用AI助手！我可以回答问题、提供信息或协助您完成任务。输入'exit'或'quit'退出对话。"
-            )
-            system_prompt = prompt if prompt else "你是一个智能AI助手。"
-            click.echo(welcome_message)
-            client = create_client()
-            while True:
-                user_input = click.prompt("用户", type=str)
-                if user_input.lower() in ["exit", "quit"]:
-                    break
-                client.text_completion(
-                    prompt=user_input, system_prompt=system_prompt, print_output=True
-                )
+            _interactive(prompt, start)
     except FileNotFoundError as e:
         click.echo(f"文件未找到错误: {e}")
     except ValueError as e:
@@ -92,6 +91,133 @@ def cli(
         click.echo(f"操作错误: {e}")
 
 
+def _analyze_image(
+    text: Optional[str], path: Optional[str], prompt: Optional[str], save: Optional[str]
+) -> None:
+    """
+    分析指定图片,未指定图片时分析屏幕截图
+    """
+    from ..models.client import create_client
+
+    image_prompt = text if text else "请描述并分析这张图片中的内容"
+    system_prompt = prompt if prompt else "你是一个擅长分析图像的助手。"
+    image_bytes = None
+
+    if path:
+        if not os.path.exists(path):
+            click.echo(f"错误: 图片文件不存在: {path}")
+            return
+        click.echo(f"正在分析图片: {path}")
+        client = create_client()
+    else:
+        image_bytes, client = _capture_screenshot(save)
+        click.echo("正在分析屏幕截图")
+
+    client.image_text_completion(
+        prompt=image_prompt,
+        image_path=path,
+        system_prompt=system_prompt,
+        print_output=True,
+        image_bytes=image_bytes,
+    )
+
+
+def _capture_screenshot(save: Optional[str]) -> Tuple[bytes, "AIClient"]:
+    """
+    截取屏幕截图并创建客户端,指定 save 时同时保存截图
+
+    Returns:
+        截图数据和 AI 客户端实例
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ..models.client import create_client
+    from ..utils.screenshot import format_for_path, get_screenshot_bytes, save_image
+
+    # 保存截图时按扩展名确定格式,否则使用体积较小的 JPEG
+    fmt = format_for_path(save) if save else "jpeg"
+
+    # 截图和客户端初始化互不依赖,并行执行
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        screenshot_future = executor.submit(get_screenshot_bytes, fmt)
+        client_future = executor.submit(create_client)
+        # 截图直接在内存中发送,仅在指定 --save 时写入磁盘
+        image_bytes = screenshot_future.result()
+        client = client_future.result()
+    if save:
+        save_image(image_bytes, save)
+        click.echo(f"截图已保存: {save}")
+    return image_bytes, client
+
+
+def _process_batch(batch: str, prompt: Optional[str]) -> None:
+    """
+    并发处理批量文件中的提示词,按顺序输出结果
+    """
+    import asyncio
+    from ..models.client import create_client
+
+    system_prompt = prompt if prompt else "你是一个智能AI助手。"
+    with open(batch, "r", encoding="utf-8") as batch_file:
+        prompts = [line.strip() for line in batch_file if line.strip()]
+    client = create_client()
+    responses = asyncio.run(_run_batch(client, prompts, system_prompt))
+    for index, (batch_prompt, response) in enumerate(zip(prompts, responses), start=1):
+        # 单条请求失败不影响其他结果的输出
+        if isinstance(response, BaseException):
+            click.echo(f"[{index}] {batch_prompt}\n错误: {response}\n")
+        else:
+            click.echo(f"[{index}] {batch_prompt}\n{response}\n")
+
+
+def _interactive(prompt: Optional[str], start: Optional[str]) -> None:
+    """
+    交互式对话,输入 exit 或 quit 退出
+    """
+    from ..models.client import create_client
+
+    welcome_message = (
+        start
+        if start
+        else "欢迎使用AI助手！我可以回答问题、提供信息或协助您完成任务。输入'exit'或'quit'退出对话。"
+    )
+    system_prompt = prompt if prompt else "你是一个智能AI助手。"
+    click.echo(welcome_message)
+    client = create_client()
+    while True:
+        user_input = click.prompt("用户", type=str)
+        if user_input.lower() in ["exit", "quit"]:
+            break
+        client.text_completion(
+            prompt=user_input, system_prompt=system_prompt, print_output=True
+        )
+
+
+async def _run_batch(
+    client: "AIClient", prompts: List[str], system_prompt: str
+) -> List[Union[str, BaseException]]:
+    """
+    并发发送多条文本请求,结果按提示词顺序返回,失败的请求返回对应的异常
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def complete(batch_prompt: str) -> str:
+        async with semaphore:
+            return await client.atext_completion(
+                prompt=batch_prompt, system_prompt=system_prompt
+            )
+
+    try:
+        return await asyncio.gather(
+            *[complete(batch_prompt) for batch_prompt in prompts],
+            return_exceptions=True,
+        )
+    finally:
+        # 客户端在进程内缓存,连接池需在本次事件循环结束前关闭
+        await client.aclose()
+
+
 if __name__ == "__main__":
     # Click 自动处理命令行参数
     cli()
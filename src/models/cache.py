@@ -0,0 +1,224 @@
+"""
+本地响应缓存模块,对重复或相近的提问直接返回已保存的回答
+
+通过环境变量 AG_CACHE=1 启用精确匹配,AG_SEMANTIC_CACHE=1 额外启用近似匹配,
+需要安装可选依赖: pip install -e ".[cache]"
+"""
+
+from typing import Optional, Any, Dict, Union
+import functools
+import hashlib
+import os
+
+# 缓存目录
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ag")
+
+# 近似匹配使用的向量模型及余弦相似度阈值
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+
+# 每个系统提示下最多保留的提问向量数,超出时丢弃最早的
+MAX_VECTORS = 256
+
+# 文本回答和图像分析结果的缓存有效期(秒)
+TEXT_CACHE_EXPIRE = 7 * 86400
+IMAGE_CACHE_EXPIRE = 86400
+
+
+class SemanticCache:
+    """
+    语义缓存类,精确匹配优先,未命中时按向量相似度查找相近的提问
+    """
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        threshold: float = SIMILARITY_THRESHOLD,
+        semantic: bool = False,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            directory: 缓存目录
+            threshold: 近似匹配的余弦相似度阈值
+            semantic: 是否启用近似匹配,启用后需要加载向量模型
+        """
+        try:
+            import diskcache  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ValueError(
+                '启用缓存需要安装可选依赖,请执行 pip install -e ".[cache]"'
+            ) from e
+
+        self.cache = diskcache.Cache(directory)
+        self.threshold = threshold
+        self.semantic = semantic
+        self._model: Any = None
+        self._embeddings: Dict[str, Any] = {}
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        """
+        计算各部分内容的 BLAKE2b 摘要
+        """
+        h = hashlib.blake2b(digest_size=32)
+        for part in parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _embed(self, prompt: str) -> Any:
+        """
+        计算提示词的归一化向量,首次调用时才加载模型
+        """
+        if prompt not in self._embeddings:
+            if self._model is None:
+                # pylint: disable-next=import-outside-toplevel
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(EMBEDDING_MODEL)
+            self._embeddings[prompt] = self._model.encode(
+                [prompt], normalize_embeddings=True
+            ).astype("float32")
+        return self._embeddings[prompt]
+
+    def _nearest(self, prompt: str, system_prompt: str) -> Optional[str]:
+        """
+        在相同系统提示下查找最相近的已缓存提问
+        """
+        stored = self.cache.get(("vectors", self._digest(system_prompt)))
+        if stored is None:
+            return None
+
+        # 向量已归一化,内积即余弦相似度;条目数有上限,直接矩阵乘即可
+        vectors, keys = stored
+        scores = vectors @ self._embed(prompt)[0]
+        best = int(scores.argmax())
+        if scores[best] <= self.threshold:
+            return None
+        return self.cache.get(("text", keys[best]))
+
+    def get(self, prompt: str, system_prompt: str) -> Optional[str]:
+        """
+        查找缓存的回答
+
+        Args:
+            prompt: 用户提示
+            system_prompt: 系统提示
+
+        Returns:
+            缓存的回答,未命中时返回 None
+        """
+        response = self.cache.get(("text", self._digest(system_prompt, prompt)))
+        if response is not None or not self.semantic:
+            return response
+        return self._nearest(prompt, system_prompt)
+
+    def set(self, prompt: str, system_prompt: str, response: str) -> None:
+        """
+        保存回答
+
+        Args:
+            prompt: 用户提示
+            system_prompt: 系统提示
+            response: AI 的回答
+        """
+        key = self._digest(system_prompt, prompt)
+        self.cache.set(("text", key), response, expire=TEXT_CACHE_EXPIRE)
+        if not self.semantic:
+            return
+
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        vectors_key = ("vectors", self._digest(system_prompt))
+        vector = self._embed(prompt)
+        with self.cache.transact():
+            stored = self.cache.get(vectors_key)
+            if stored is None:
+                vectors, keys = vector, [key]
+            else:
+                vectors = np.vstack([stored[0][1 - MAX_VECTORS :], vector])
+                keys = stored[1][1 - MAX_VECTORS :] + [key]
+            self.cache.set(vectors_key, (vectors, keys), expire=TEXT_CACHE_EXPIRE)
+
+    @staticmethod
+    def image_key(image: Union[str, bytes], prompt: str, system_prompt: str) -> str:
+        """
+        以图像内容和提示词计算图像分析请求的缓存键
+
+        图像路径以路径、修改时间和大小作为标识,不读取文件内容。
+
+        Args:
+            image: 图像数据、图像路径或 data URL
+            prompt: 用户提示
+            system_prompt: 系统提示
+
+        Returns:
+            BLAKE3 摘要
+        """
+        import blake3  # pylint: disable=import-outside-toplevel
+
+        h = blake3.blake3()
+        if isinstance(image, bytes):
+            h.update(image)
+        elif image.startswith("data:image"):
+            h.update(image.encode("ascii"))
+        else:
+            stat = os.stat(image)
+            identity = f"{os.path.abspath(image)}\0{stat.st_mtime_ns}\0{stat.st_size}"
+            h.update(identity.encode("utf-8"))
+        h.update(b"\0")
+        h.update(prompt.encode("utf-8"))
+        h.update(b"\0")
+        h.update(system_prompt.encode("utf-8"))
+        return h.hexdigest()
+
+    def get_image(self, key: str) -> Optional[str]:
+        """
+        查找缓存的图像分析结果
+
+        Args:
+            key: image_key 计算出的缓存键
+
+        Returns:
+            缓存的回答,未命中时返回 None
+        """
+        return self.cache.get(("image", key))
+
+    def set_image(self, key: str, response: str) -> None:
+        """
+        保存图像分析结果
+
+        Args:
+            key: image_key 计算出的缓存键
+            response: AI 的回答
+        """
+        self.cache.set(("image", key), response, expire=IMAGE_CACHE_EXPIRE)
+
+
+def cache_enabled() -> bool:
+    """
+    是否通过环境变量 AG_CACHE 启用了缓存
+    """
+    return os.getenv("AG_CACHE") == "1"
+
+
+def semantic_cache_enabled() -> bool:
+    """
+    是否通过环境变量 AG_SEMANTIC_CACHE 启用了近似匹配
+    """
+    return os.getenv("AG_SEMANTIC_CACHE") == "1"
+
+
+@functools.lru_cache(maxsize=1)
+def get_cache() -> Optional[SemanticCache]:
+    """
+    获取缓存实例
+
+    Returns:
+        SemanticCache 实例,未启用缓存时返回 None
+    """
+    if not cache_enabled():
+        return None
+    return SemanticCache(semantic=semantic_cache_enabled())
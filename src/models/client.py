@@ -2,13 +2,249 @@
 统一的 AI 客户端模块,支持 OpenAI 规范 API
 """
 
-from typing import Optional, Any, Iterator, List, Union
+from typing import Optional, Any, AsyncIterator, Dict, Iterable, Iterator, List, Tuple, Union
+import functools
 import os
-import base64
-from openai import OpenAI
-from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
+import sys
+import time
+import httpx
+import orjson
+import pybase64
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from openai.types.chat import ChatCompletionMessageParam
 from dotenv import load_dotenv
 
+from .cache import SemanticCache, get_cache
+
+
+# 服务端的提示词缓存只在消息前缀逐字节相同时命中,因此构建消息时
+# 静态内容(系统提示、图像)必须位于动态内容(用户提示词)之前。
+
+# 流式输出的刷新间隔(秒)和最多积压的片段数,兼顾打字效果和系统调用次数
+_FLUSH_INTERVAL = 0.016
+_FLUSH_MAX_PENDING = 32
+
+# 空闲连接的保持时间(秒)
+_KEEPALIVE_EXPIRY = 300
+
+# 异步客户端的最大并发连接数
+_ASYNC_MAX_CONNECTIONS = 32
+
+# 各图像格式对应的 data URL 前缀
+_DATA_URL_PREFIXES = {
+    mime: f"data:{mime};base64," for mime in ("image/png", "image/jpeg", "image/webp")
+}
+_DATA_URL_PREFIX_BYTES = {
+    mime: prefix.encode("ascii") for mime, prefix in _DATA_URL_PREFIXES.items()
+}
+
+# 分块读取的大小,必须是 3 的倍数,保证各块的 base64 结果可以直接拼接
+_ENCODE_CHUNK_SIZE = 57 * 4096
+
+
+def _resolve_image(
+    image_path: Optional[str], image_bytes: Optional[bytes]
+) -> Union[str, bytes]:
+    """
+    确定要分析的图像,image_bytes 优先
+
+    Raises:
+        ValueError: 如果 image_path 和 image_bytes 均未提供
+    """
+    if image_bytes is not None:
+        return image_bytes
+    if image_path:
+        return image_path
+    raise ValueError("缺少图像,请提供 image_path 或 image_bytes")
+
+
+def _lookup_text_cache(
+    prompt: str, system_prompt: str, kwargs: Dict[str, Any]
+) -> Tuple[Optional[SemanticCache], Optional[str]]:
+    """
+    查找文本请求的缓存,仅缓存未附加额外参数的请求
+
+    Returns:
+        缓存实例(不使用缓存时为 None)和命中的回答
+    """
+    cache = get_cache() if not kwargs else None
+    if cache is None:
+        return None, None
+    return cache, cache.get(prompt, system_prompt)
+
+
+def _store_text_cache(
+    cache: Optional[SemanticCache], prompt: str, system_prompt: str, response: str
+) -> None:
+    """
+    保存文本请求的回答
+    """
+    if cache is not None and response:
+        cache.set(prompt, system_prompt, response)
+
+
+def _lookup_image_cache(
+    image: Union[str, bytes], prompt: str, system_prompt: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    查找图像分析请求的缓存
+
+    Returns:
+        缓存键(未启用缓存时为 None)和命中的回答
+    """
+    cache = get_cache()
+    if cache is None:
+        return None, None
+    cache_key = cache.image_key(image, prompt, system_prompt)
+    return cache_key, cache.get_image(cache_key)
+
+
+def _store_image_cache(cache_key: Optional[str], response: str) -> None:
+    """
+    保存图像分析请求的回答
+    """
+    cache = get_cache()
+    if cache is not None and cache_key is not None and response:
+        cache.set_image(cache_key, response)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> None:
+    """
+    加载 .env 文件中的环境变量,已导出的变量不会被覆盖
+    """
+    load_dotenv()
+
+
+def _parse_chunk(data: str) -> Dict[str, Any]:
+    """
+    解析一条 SSE 数据
+
+    Raises:
+        ValueError: 如果服务端在流中返回错误
+    """
+    chunk = orjson.loads(data)
+    if "error" in chunk:
+        raise ValueError(f"服务端返回错误: {chunk['error']}")
+    return chunk
+
+
+def _sse_data(line: str) -> Optional[str]:
+    """
+    取出 SSE 数据行的内容,非数据行(注释、空行、事件名等)返回 None
+    """
+    if not line.startswith("data:"):
+        return None
+    return line[5:].lstrip()
+
+
+def _iter_sse_chunks(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    将 SSE 文本行解析为字典形式的响应片段,遇到 [DONE] 时结束
+
+    Args:
+        lines: SSE 文本行
+
+    Yields:
+        字典形式的流式响应片段
+
+    Raises:
+        ValueError: 如果服务端在流中返回错误
+    """
+    for line in lines:
+        data = _sse_data(line)
+        if data is None:
+            continue
+        if data == "[DONE]":
+            break
+        yield _parse_chunk(data)
+
+
+def _write_out(pending: List[str]) -> None:
+    """
+    将积压的片段一次性写出到标准输出并清空
+    """
+    if pending:
+        sys.stdout.write("".join(pending))
+        sys.stdout.flush()
+        pending.clear()
+
+
+def _sniff_mime(data: bytes) -> str:
+    """
+    根据文件头的魔数确定实际的图像格式,无法识别时按 PNG 处理
+
+    Args:
+        data: 图像数据,至少包含前 12 个字节
+
+    Returns:
+        图像的 MIME 类型
+    """
+    header = data[:12]
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def _encode_image_bytes(image_bytes: bytes) -> str:
+    """
+    将内存中的图像数据编码为 data URL
+
+    Args:
+        image_bytes: 图像数据
+
+    Returns:
+        data URL 格式的图像
+    """
+    # pybase64 直接返回 str,只需与预先构建的前缀拼接一次
+    return _DATA_URL_PREFIXES[_sniff_mime(image_bytes)] + pybase64.b64encode_as_string(
+        image_bytes
+    )
+
+
+def _encode_image_file(image_path: str) -> str:
+    """
+    分块读取图像文件并编码为 data URL
+
+    按文件大小预先分配好最终长度的缓冲区,逐块编码后原地写入,避免同时持有
+    原始数据、编码结果和拼接后的字符串三份完整副本,也避免缓冲区反复扩容。
+
+    Args:
+        image_path: 图像路径
+
+    Returns:
+        data URL 格式的图像
+    """
+    with open(image_path, "rb") as image_file:
+        size = os.fstat(image_file.fileno()).st_size
+        chunk = image_file.read(_ENCODE_CHUNK_SIZE)
+        prefix = _DATA_URL_PREFIX_BYTES[_sniff_mime(chunk)]
+        buf = bytearray(len(prefix) + (size + 2) // 3 * 4)
+        buf[: len(prefix)] = prefix
+        pos = len(prefix)
+        while chunk:
+            encoded = pybase64.b64encode(chunk)
+            buf[pos : pos + len(encoded)] = encoded
+            pos += len(encoded)
+            chunk = image_file.read(_ENCODE_CHUNK_SIZE)
+    # 读取期间文件大小发生变化时截掉多余的部分
+    del buf[pos:]
+    return buf.decode("ascii")
+
+
+@functools.lru_cache(maxsize=4)
+def _encode_image_cached(
+    image_path: str, mtime_ns: int, size: int  # pylint: disable=unused-argument
+) -> str:
+    """
+    缓存图像文件的编码结果,mtime_ns 和 size 仅作为缓存键使用
+    """
+    return _encode_image_file(image_path)
+
 
 class AIClient:
     """
@@ -20,6 +256,7 @@ class AIClient:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         model: Optional[str] = None,
+        cache_control: Optional[bool] = None,
     ):
         """
         初始化 AI 客户端
@@ -28,10 +265,13 @@ class AIClient:
             api_key: API 密钥,如果为 None 则从环境变量读取
             base_url: API 基础 URL,如果为 None 则从环境变量读取
             model: 使用的模型名称,如果为 None 则从环境变量读取
+            cache_control: 是否为图像添加 Anthropic 风格的 cache_control 缓存断点,
+                如果为 None 则由环境变量 AG_CACHE_CONTROL=1 启用,默认关闭
         """
         # 如果未提供参数,从环境变量加载
+        # .env 中还包含 AG_CACHE 等可选配置,因此总是加载(每个进程只读取一次)
+        _load_env()
         if api_key is None or base_url is None or model is None:
-            load_dotenv()
             api_key = api_key or os.getenv("API_KEY")
             base_url = base_url or os.getenv("BASE_URL")
             model = model or os.getenv("MODEL")
@@ -49,7 +289,119 @@ class AIClient:
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        # Anthropic 风格的服务需要显式标记缓存断点,该字段不属于 OpenAI 规范
+        if cache_control is None:
+            cache_control = os.getenv("AG_CACHE_CONTROL") == "1"
+        self.explicit_prompt_cache = cache_control
+        # 启用 HTTP/2 和长连接,交互式模式下多轮对话复用同一个 TLS 会话
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            # 基于 SDK 的默认客户端,保留其重定向、超时等默认设置
+            http_client=DefaultHttpxClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=4,
+                    keepalive_expiry=_KEEPALIVE_EXPIRY,
+                ),
+            ),
+        )
+        self._async_client: Optional[AsyncOpenAI] = None
+        # 图像分析请求的默认参数
+        self._image_defaults = {"modalities": ["text"]}
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        异步客户端,首次使用时创建,所有并发请求共享同一个 HTTP/2 连接池
+        """
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=DefaultAsyncHttpxClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=_ASYNC_MAX_CONNECTIONS),
+                ),
+            )
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        关闭异步客户端并释放连接池
+
+        连接池绑定在创建它的事件循环上,每次 asyncio.run 结束前都应调用,
+        之后再次使用时会重新创建异步客户端。
+        """
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _build_params(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        stream: bool,
+        include_usage: bool,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        构建聊天完成请求的参数
+        """
+        # 设置默认参数
+        default_params = {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+        }
+
+        # 添加流式选项（如果启用了流式响应）
+        if stream and include_usage:
+            default_params["stream_options"] = {"include_usage": True}
+
+        # 合并用户提供的额外参数
+        return {**default_params, **kwargs}
+
+    def _image_messages(
+        self, image: Union[str, bytes], prompt: str, system_prompt: str
+    ) -> List[ChatCompletionMessageParam]:
+        """
+        构建图像分析请求的消息
+
+        Args:
+            image: 图像数据、图像路径或 data URL
+            prompt: 用户提示
+            system_prompt: 系统提示
+
+        Returns:
+            消息列表
+        """
+        # 确定图像格式
+        if isinstance(image, bytes):
+            image_url = _encode_image_bytes(image)
+        elif image.startswith("data:image"):
+            image_url = image
+        else:
+            # 以修改时间和大小作为缓存条件,文件未变化时跳过读取和编码
+            stat = os.stat(image)
+            image_url = _encode_image_cached(image, stat.st_mtime_ns, stat.st_size)
+
+        # 构建消息: 系统提示和图像在前作为可缓存的前缀,提示词在后
+        image_part = {
+            "type": "image_url",
+            "image_url": {"url": image_url},
+        }
+        if self.explicit_prompt_cache:
+            image_part["cache_control"] = {"type": "ephemeral"}
+        return [
+            {
+                "role": "system",
+                "content": [{"type": "text", "text": system_prompt}],
+            },
+            {
+                "role": "user",
+                "content": [image_part, {"type": "text", "text": prompt}],
+            },
+        ]
 
     def chat_completion(
         self,
@@ -57,10 +409,12 @@ class AIClient:
         stream: bool = True,
         include_usage: bool = True,
         **kwargs,
-    ) -> Union[Iterator[ChatCompletionChunk], Any]:
+    ) -> Union[Iterator[Dict[str, Any]], Dict[str, Any]]:
         """
         创建聊天完成请求
 
+        响应直接读取原始数据并用 orjson 解析为字典,跳过 Pydantic 模型的构建。
+
         Args:
             messages: 消息列表
             stream: 是否使用流式响应
@@ -68,27 +422,36 @@ class AIClient:
             **kwargs: 其他参数
 
         Returns:
-            流式响应迭代器或完整响应
+            字典形式的流式响应片段迭代器或完整响应
         """
-        # 设置默认参数
-        default_params = {
-            "model": self.model,
-            "messages": messages,
-            "stream": stream,
-        }
+        params = self._build_params(messages, stream, include_usage, kwargs)
 
-        # 添加流式选项（如果启用了流式响应）
-        if stream and include_usage:
-            default_params["stream_options"] = {"include_usage": True}
+        # 发送请求
+        if stream:
+            return self._iter_stream_chunks(params)
+        raw = self.client.chat.completions.with_raw_response.create(**params)
+        return orjson.loads(raw.content)
 
-        # 合并用户提供的额外参数
-        params = {**default_params, **kwargs}
+    def _iter_stream_chunks(self, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        直接读取 SSE 原始数据行并用 orjson 解析,跳过 Pydantic 模型的构建
 
-        # 发送请求
-        return self.client.chat.completions.create(**params)
+        Args:
+            params: 请求参数
+
+        Yields:
+            字典形式的流式响应片段
+
+        Raises:
+            ValueError: 如果服务端在流中返回错误
+        """
+        with self.client.chat.completions.with_streaming_response.create(
+            **params
+        ) as response:
+            yield from _iter_sse_chunks(response.iter_lines())
 
     def process_stream(
-        self, completion: Iterator[ChatCompletionChunk], print_output: bool = True
+        self, completion: Iterator[Dict[str, Any]], print_output: bool = True
     ) -> str:
         """
         处理流式响应
@@ -100,38 +463,50 @@ class AIClient:
         Returns:
             完整的响应文本
         """
-        full_response = ""
+        parts = []
         usage_info = None
+        # 待输出的片段,按时间间隔或数量批量写出,减少系统调用
+        pending = []
+        last_flush = time.monotonic()
 
         try:
             for chunk in completion:
-                if (
-                    hasattr(chunk, "choices")
-                    and chunk.choices
-                    and hasattr(chunk.choices[0], "delta")
-                    and hasattr(chunk.choices[0].delta, "content")
-                ):
-                    content = chunk.choices[0].delta.content
-                    if content:
-                        full_response += content
-                        if print_output:
-                            print(content, end="", flush=True)
+                try:
+                    content = chunk["choices"][0]["delta"].get("content")
+                except (KeyError, IndexError, TypeError):
+                    content = None
+                if content:
+                    parts.append(content)
+                    if print_output:
+                        pending.append(content)
+                        now = time.monotonic()
+                        if (
+                            now - last_flush > _FLUSH_INTERVAL
+                            or len(pending) > _FLUSH_MAX_PENDING
+                        ):
+                            _write_out(pending)
+                            last_flush = now
 
                 # 收集使用情况统计
-                if hasattr(chunk, "usage") and chunk.usage:
-                    usage_info = chunk.usage
+                usage = chunk.get("usage")
+                if usage:
+                    usage_info = usage
+
+            if print_output:
+                _write_out(pending)
 
             # 打印使用情况统计（如果有）
             if usage_info and print_output:
                 print(
-                    f"\n\n提问: {usage_info.prompt_tokens} tokens,"
-                    f"回答: {usage_info.completion_tokens} tokens,"
-                    f"总长度: {usage_info.total_tokens} tokens."
+                    f"\n\n提问: {usage_info['prompt_tokens']} tokens,"
+                    f"回答: {usage_info['completion_tokens']} tokens,"
+                    f"总长度: {usage_info['total_tokens']} tokens."
                 )
 
-            return full_response
+            return "".join(parts)
         except Exception as e:
             if print_output:
+                _write_out(pending)
                 print(f"\n处理响应时发生错误: {e}")
             raise
 
@@ -156,6 +531,12 @@ class AIClient:
         Returns:
             完整的响应文本
         """
+        cache, cached = _lookup_text_cache(prompt, system_prompt, kwargs)
+        if cached is not None:
+            if print_output:
+                print(cached)
+            return cached
+
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt},
@@ -163,21 +544,24 @@ class AIClient:
         completion = self.chat_completion(messages=messages, stream=stream, **kwargs)
 
         if stream:
-            return self.process_stream(completion, print_output=print_output)
+            response = self.process_stream(completion, print_output=print_output)
+        else:
+            # 非流式响应处理
+            response = completion["choices"][0]["message"]["content"]
+            if print_output:
+                print(response)
 
-        # 非流式响应处理
-        response = completion.choices[0].message.content
-        if print_output:
-            print(response)
+        _store_text_cache(cache, prompt, system_prompt, response)
         return response
 
-    def image_text_completion(
+    def image_text_completion(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         prompt: str,
-        image_path: str,
+        image_path: Optional[str] = None,
         system_prompt: str = "你是一个擅长分析图像的助手。",
         stream: bool = True,
         print_output: bool = True,
+        image_bytes: Optional[bytes] = None,
         **kwargs,
     ) -> str:
         """
@@ -189,55 +573,211 @@ class AIClient:
             system_prompt: 系统提示
             stream: 是否使用流式响应
             print_output: 是否打印输出
+            image_bytes: 内存中的图像数据,提供时忽略 image_path
             **kwargs: 其他参数
 
         Returns:
             完整的响应文本
+
+        Raises:
+            ValueError: 如果 image_path 和 image_bytes 均未提供
         """
-        # 确定图像格式
-        if image_path.startswith("data:image"):
-            image_url = image_path
+        image = _resolve_image(image_path, image_bytes)
+
+        # 图像和提示词均未变化时直接返回缓存的结果,跳过编码和请求
+        cache_key, cached = _lookup_image_cache(image, prompt, system_prompt)
+        if cached is not None:
+            if print_output:
+                print(cached)
+            return cached
+
+        messages = self._image_messages(image, prompt, system_prompt)
+
+        # 发送请求,默认参数可被调用方覆盖
+        completion = self.chat_completion(
+            messages=messages, stream=stream, **{**self._image_defaults, **kwargs}
+        )
+
+        if stream:
+            response = self.process_stream(completion, print_output=print_output)
         else:
-            # 读取并编码图像
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
-                image_url = f"data:image/png;base64,{base64_image}"
+            # 非流式响应处理
+            response = completion["choices"][0]["message"]["content"]
+            if print_output:
+                print(response)
+
+        _store_image_cache(cache_key, response)
+        return response
+
+    async def achat_completion(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        stream: bool = True,
+        include_usage: bool = False,
+        **kwargs,
+    ) -> Union[AsyncIterator[Dict[str, Any]], Dict[str, Any]]:
+        """
+        异步创建聊天完成请求
+
+        Args:
+            messages: 消息列表
+            stream: 是否使用流式响应
+            include_usage: 是否包含使用情况统计
+            **kwargs: 其他参数
+
+        Returns:
+            字典形式的异步流式响应片段迭代器或完整响应
+        """
+        params = self._build_params(messages, stream, include_usage, kwargs)
+        if stream:
+            return self._aiter_stream_chunks(params)
+        raw = await self.async_client.chat.completions.with_raw_response.create(
+            **params
+        )
+        return orjson.loads(raw.content)
+
+    async def _aiter_stream_chunks(
+        self, params: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        异步读取 SSE 原始数据行并用 orjson 解析
+
+        Args:
+            params: 请求参数
+
+        Yields:
+            字典形式的流式响应片段
+
+        Raises:
+            ValueError: 如果服务端在流中返回错误
+        """
+        async with self.async_client.chat.completions.with_streaming_response.create(
+            **params
+        ) as response:
+            async for line in response.iter_lines():
+                data = _sse_data(line)
+                if data is None:
+                    continue
+                if data == "[DONE]":
+                    break
+                yield _parse_chunk(data)
+
+    async def aprocess_stream(self, completion: AsyncIterator[Dict[str, Any]]) -> str:
+        """
+        异步处理流式响应,只收集文本不打印,便于并发请求
+
+        Args:
+            completion: 字典形式的异步流式响应片段迭代器
+
+        Returns:
+            完整的响应文本
+        """
+        parts = []
+        async for chunk in completion:
+            try:
+                content = chunk["choices"][0]["delta"].get("content")
+            except (KeyError, IndexError, TypeError):
+                content = None
+            if content:
+                parts.append(content)
+        return "".join(parts)
+
+    async def atext_completion(
+        self,
+        prompt: str,
+        system_prompt: str = "你是这个领域的专家，请告诉我你会怎么做这件事。",
+        stream: bool = True,
+        **kwargs,
+    ) -> str:
+        """
+        异步文本完成请求
+
+        Args:
+            prompt: 用户提示
+            system_prompt: 系统提示
+            stream: 是否使用流式响应
+            **kwargs: 其他参数
+
+        Returns:
+            完整的响应文本
+        """
+        cache, cached = _lookup_text_cache(prompt, system_prompt, kwargs)
+        if cached is not None:
+            return cached
 
-        # 构建消息
         messages = [
-            {
-                "role": "system",
-                "content": [{"type": "text", "text": system_prompt}],
-            },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": image_url},
-                    },
-                    {"type": "text", "text": prompt},
-                ],
-            },
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
         ]
+        completion = await self.achat_completion(
+            messages=messages, stream=stream, **kwargs
+        )
 
-        # 默认添加 modalities 参数
-        if "modalities" not in kwargs:
-            kwargs["modalities"] = ["text"]
+        if stream:
+            response = await self.aprocess_stream(completion)
+        else:
+            response = completion["choices"][0]["message"]["content"]
 
-        # 发送请求
-        completion = self.chat_completion(messages=messages, stream=stream, **kwargs)
+        _store_text_cache(cache, prompt, system_prompt, response)
+        return response
+
+    async def aimage_text_completion(
+        self,
+        prompt: str,
+        image_path: Optional[str] = None,
+        system_prompt: str = "你是一个擅长分析图像的助手。",
+        stream: bool = True,
+        image_bytes: Optional[bytes] = None,
+        **kwargs,
+    ) -> str:
+        """
+        异步图像分析完成请求
+
+        Args:
+            prompt: 用户提示
+            image_path: 图像路径或base64编码的图像
+            system_prompt: 系统提示
+            stream: 是否使用流式响应
+            image_bytes: 内存中的图像数据,提供时忽略 image_path
+            **kwargs: 其他参数
+
+        Returns:
+            完整的响应文本
+
+        Raises:
+            ValueError: 如果 image_path 和 image_bytes 均未提供
+        """
+        image = _resolve_image(image_path, image_bytes)
+
+        cache_key, cached = _lookup_image_cache(image, prompt, system_prompt)
+        if cached is not None:
+            return cached
+
+        messages = self._image_messages(image, prompt, system_prompt)
+
+        completion = await self.achat_completion(
+            messages=messages, stream=stream, **{**self._image_defaults, **kwargs}
+        )
 
         if stream:
-            return self.process_stream(completion, print_output=print_output)
+            response = await self.aprocess_stream(completion)
+        else:
+            response = completion["choices"][0]["message"]["content"]
 
-        # 非流式响应处理
-        response = completion.choices[0].message.content
-        if print_output:
-            print(response)
+        _store_image_cache(cache_key, response)
         return response
 
 
+@functools.lru_cache(maxsize=1)
+def _get_client(
+    api_key: Optional[str], base_url: Optional[str], model: Optional[str]
+) -> AIClient:
+    """
+    按配置缓存 AI 客户端实例,复用底层的 HTTP 连接池
+    """
+    return AIClient(api_key=api_key, base_url=base_url, model=model)
+
+
 # 创建单例实例
 def create_client(
     api_key: Optional[str] = None,
@@ -256,7 +796,7 @@ def create_client(
         AIClient 实例
     """
     try:
-        return AIClient(api_key=api_key, base_url=base_url, model=model)
+        return _get_client(api_key, base_url, model)
     except Exception as e:
         print(f"创建客户端时发生错误: {e}")
         raise
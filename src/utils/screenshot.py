@@ -2,33 +2,144 @@
 截图处理模块,负责截取屏幕截图并将其发送到 AI 服务进行分析
 """
 
+import functools
+import io
 import os
-from typing import Optional, Union, Iterator
-import base64
+from typing import Optional, Union, BinaryIO
+import pybase64
 import pyautogui
-from openai.types.chat import ChatCompletionChunk
 
 from src.models.client import create_client
 
 
-def get_screenshot(save_path: str = "./test.png") -> str:
+# 截图格式对应的 PIL 格式名、默认扩展名和保存参数
+_SCREENSHOT_FORMATS = {
+    "png": ("PNG", ".png", {}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 85, "optimize": True}),
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+}
+
+
+def get_screenshot(save_path: Optional[str] = None, fmt: str = "png") -> str:
     """
     截取屏幕截图并保存
 
+    JPEG 或 WebP 的体积通常只有无损 PNG 的几分之一,可显著减少编码和上传的开销。
+
     Args:
-        save_path: 保存截图的路径
+        save_path: 保存截图的路径,为 None 时保存为当前目录下的 test 文件,
+            扩展名与格式对应,默认即 ./test.png
+        fmt: 截图格式,可选 "png"、"jpeg"、"webp"
 
     Returns:
         保存的截图路径
+
+    Raises:
+        ValueError: 如果截图格式不受支持
     """
+    if save_path is None:
+        save_path = f"./test{_get_format(fmt)[1]}"
+
     # 确保目录存在
-    os.makedirs(os.path.dirname(os.path.abspath(save_path)) or ".", exist_ok=True)
+    _ensure_dir(os.path.dirname(os.path.abspath(save_path)))
 
-    screenshot = pyautogui.screenshot()
-    screenshot.save(save_path)
+    _save_screenshot(save_path, fmt)
+    return save_path
+
+
+def get_screenshot_bytes(fmt: str = "jpeg") -> bytes:
+    """
+    截取屏幕截图并直接返回编码后的图像数据,不写入磁盘
+
+    Args:
+        fmt: 截图格式,可选 "png"、"jpeg"、"webp"
+
+    Returns:
+        图像数据
+
+    Raises:
+        ValueError: 如果截图格式不受支持
+    """
+    buf = io.BytesIO()
+    _save_screenshot(buf, fmt)
+    return buf.getvalue()
+
+
+def save_image(image_bytes: bytes, save_path: str) -> str:
+    """
+    将图像数据保存到文件
+
+    Args:
+        image_bytes: 图像数据
+        save_path: 保存的路径
+
+    Returns:
+        保存的路径
+    """
+    # 确保目录存在
+    _ensure_dir(os.path.dirname(os.path.abspath(save_path)))
+
+    with open(save_path, "wb") as image_file:
+        image_file.write(image_bytes)
     return save_path
 
 
+@functools.lru_cache(maxsize=16)
+def _ensure_dir(directory: str) -> None:
+    """
+    确保目录存在,同一目录只检查一次
+    """
+    os.makedirs(directory or ".", exist_ok=True)
+
+
+def format_for_path(save_path: str) -> str:
+    """
+    根据保存路径的扩展名确定截图格式
+
+    Args:
+        save_path: 保存截图的路径
+
+    Returns:
+        截图格式,可选 "png"、"jpeg"、"webp"
+
+    Raises:
+        ValueError: 如果扩展名不对应任何支持的截图格式
+    """
+    extension = os.path.splitext(save_path)[1].lower()
+    if extension == ".jpeg":
+        return "jpeg"
+    for fmt, (_, fmt_extension, _) in _SCREENSHOT_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    supported = "、".join(ext for _, ext, _ in _SCREENSHOT_FORMATS.values())
+    raise ValueError(f"不支持的截图扩展名: {save_path},可选 {supported}")
+
+
+def _get_format(fmt: str) -> tuple:
+    """
+    获取截图格式对应的保存参数
+
+    Raises:
+        ValueError: 如果截图格式不受支持
+    """
+    if fmt not in _SCREENSHOT_FORMATS:
+        raise ValueError(f"不支持的截图格式: {fmt}")
+    return _SCREENSHOT_FORMATS[fmt]
+
+
+def _save_screenshot(target: Union[str, BinaryIO], fmt: str) -> None:
+    """
+    截取屏幕截图并按指定格式写入文件路径或文件对象
+    """
+    pil_format, _, options = _get_format(fmt)
+
+    screenshot = pyautogui.screenshot()
+    if pil_format == "JPEG":
+        # JPEG 不支持透明通道
+        screenshot = screenshot.convert("RGB")
+    screenshot.save(target, pil_format, **options)
+
+
 def encode_image(image_path: str) -> str:
     """
     将图片编码为 base64
@@ -46,12 +157,12 @@ def encode_image(image_path: str) -> str:
         raise FileNotFoundError(f"图片文件不存在: {image_path}")
 
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        return pybase64.b64encode_as_string(image_file.read())
 
 
 def analyze_screenshot(
     prompt: str = "图中描绘的是什么景象？", image_path: Optional[str] = None
-) -> Union[str, Iterator[ChatCompletionChunk]]:
+) -> str:
     """
     分析截图并返回AI的描述
 
@@ -60,11 +171,10 @@ def analyze_screenshot(
         image_path: 图片路径,如果为None则自动截图
 
     Returns:
-        AI的描述或流式响应对象
+        AI的描述
     """
     # 如果未提供图片路径,则自动截图
-    if not image_path:
-        image_path = get_screenshot()
+    image_bytes = None if image_path else get_screenshot_bytes()
 
     try:
         # 创建客户端
@@ -74,6 +184,7 @@ def analyze_screenshot(
         return client.image_text_completion(
             prompt=prompt,
             image_path=image_path,
+            image_bytes=image_bytes,
             system_prompt="你是一个擅长分析图像的助手。",
             stream=True,
             print_output=False,
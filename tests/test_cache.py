@@ -0,0 +1,141 @@
+"""
+本地响应缓存模块的单元测试
+"""
+
+# pylint: disable=protected-access,too-few-public-methods
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("diskcache")
+
+# pylint: disable-next=wrong-import-position
+from src.models import cache as cache_module
+
+
+class _StubModel:
+    """按预设向量返回归一化结果的向量模型"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, prompts, normalize_embeddings=True):
+        """返回提示词对应的向量"""
+        assert normalize_embeddings
+        vector = np.array(self.vectors[prompts[0]], dtype="float64")
+        return (vector / np.linalg.norm(vector))[None, :]
+
+
+class _FailingModel:
+    """未启用近似匹配时不应被调用的向量模型"""
+
+    def encode(self, prompts, normalize_embeddings=True):
+        """始终失败"""
+        raise AssertionError(f"不应计算向量: {prompts}, {normalize_embeddings}")
+
+
+VECTORS = {
+    "今天天气怎么样": [1.0, 0.0, 0.0],
+    "今天天气如何": [0.99, 0.1, 0.0],
+    "写一首诗": [0.0, 1.0, 0.0],
+    "天气和诗": [0.7, 0.7, 0.0],
+}
+
+
+def _make_cache(tmp_path, semantic, model):
+    """创建使用临时目录和桩模型的缓存"""
+    semantic_cache = cache_module.SemanticCache(
+        directory=str(tmp_path / "cache"), semantic=semantic
+    )
+    semantic_cache._model = model
+    return semantic_cache
+
+
+def test_exact_match(tmp_path):
+    """精确匹配按系统提示和提示词区分,未启用近似匹配时不加载模型"""
+    semantic_cache = _make_cache(tmp_path, False, _FailingModel())
+    assert semantic_cache.get("写一首诗", "系统") is None
+
+    semantic_cache.set("写一首诗", "系统", "回答")
+    assert semantic_cache.get("写一首诗", "系统") == "回答"
+    assert semantic_cache.get("写一首诗", "其他系统") is None
+    assert semantic_cache.get("写一首词", "系统") is None
+
+
+def test_digest_separates_parts():
+    """各部分之间有分隔,拼接结果相同的不同输入不会冲突"""
+    digest = cache_module.SemanticCache._digest
+    assert digest("ab", "c") != digest("a", "bc")
+    assert digest("ab", "c") == digest("ab", "c")
+
+
+def test_near_match_threshold(tmp_path):
+    """相似度高于阈值时返回相近提问的回答,低于阈值时未命中"""
+    semantic_cache = _make_cache(tmp_path, True, _StubModel(VECTORS))
+    semantic_cache.set("今天天气怎么样", "系统", "晴")
+
+    # 余弦相似度约 0.995
+    assert semantic_cache.get("今天天气如何", "系统") == "晴"
+    # 余弦相似度约 0.707
+    assert semantic_cache.get("天气和诗", "系统") is None
+    assert semantic_cache.get("写一首诗", "系统") is None
+    # 近似匹配只在相同系统提示下进行
+    assert semantic_cache.get("今天天气如何", "其他系统") is None
+
+
+def test_vectors_capped(tmp_path, monkeypatch):
+    """每个系统提示下只保留最近的 MAX_VECTORS 个向量"""
+    monkeypatch.setattr(cache_module, "MAX_VECTORS", 2)
+    semantic_cache = _make_cache(tmp_path, True, _StubModel(VECTORS))
+    prompts = ["今天天气怎么样", "写一首诗", "天气和诗"]
+    for prompt in prompts:
+        semantic_cache.set(prompt, "系统", prompt + "的回答")
+
+    vectors, keys = semantic_cache.cache.get(
+        ("vectors", semantic_cache._digest("系统"))
+    )
+    assert vectors.shape == (2, 3)
+    assert keys == [semantic_cache._digest("系统", prompt) for prompt in prompts[1:]]
+    # 最早的提问已不参与近似匹配,但精确匹配仍然有效
+    assert semantic_cache.get("今天天气如何", "系统") is None
+    assert semantic_cache.get("今天天气怎么样", "系统") == "今天天气怎么样的回答"
+
+
+def test_image_key(tmp_path):
+    """图像键随图像内容、路径状态和提示词变化"""
+    pytest.importorskip("blake3")
+    image_key = cache_module.SemanticCache.image_key
+
+    assert image_key(b"abc", "提示", "系统") == image_key(b"abc", "提示", "系统")
+    assert image_key(b"abc", "提示", "系统") != image_key(b"abd", "提示", "系统")
+    assert image_key(b"abc", "提示", "系统") != image_key(b"abc", "提示2", "系统")
+    assert image_key(b"abc", "提示", "系统") != image_key(b"abc", "提示", "系统2")
+    assert image_key("data:image/png;base64,YWJj", "提示", "系统") != image_key(
+        "data:image/png;base64,YWJk", "提示", "系统"
+    )
+
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(b"abc")
+    os.utime(image_path, ns=(1_000_000_000, 1_000_000_000))
+    original = image_key(str(image_path), "提示", "系统")
+    assert image_key(str(image_path), "提示", "系统") == original
+
+    # 修改时间变化
+    os.utime(image_path, ns=(2_000_000_000, 2_000_000_000))
+    touched = image_key(str(image_path), "提示", "系统")
+    assert touched != original
+
+    # 大小变化(保持修改时间不变)
+    image_path.write_bytes(b"abcd")
+    os.utime(image_path, ns=(2_000_000_000, 2_000_000_000))
+    assert image_key(str(image_path), "提示", "系统") != touched
+
+
+def test_image_cache_roundtrip(tmp_path):
+    """图像分析结果按缓存键保存和读取"""
+    semantic_cache = _make_cache(tmp_path, False, _FailingModel())
+    assert semantic_cache.get_image("key") is None
+    semantic_cache.set_image("key", "图像描述")
+    assert semantic_cache.get_image("key") == "图像描述"
@@ -0,0 +1,210 @@
+"""
+客户端模块中图像编码和流式响应解析的单元测试
+"""
+
+# pylint: disable=protected-access
+
+import asyncio
+import base64
+import types
+
+import pytest
+
+from src.models import client
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+WEBP_HEADER = b"RIFF\x24\x00\x00\x00WEBPVP8 "
+
+
+@pytest.mark.parametrize(
+    "data, mime",
+    [
+        (PNG_HEADER, "image/png"),
+        (JPEG_HEADER, "image/jpeg"),
+        (WEBP_HEADER, "image/webp"),
+        # RIFF 容器但不是 WebP(例如 WAV)
+        (b"RIFF\x24\x00\x00\x00WAVEfmt ", "image/png"),
+        (b"GIF89a", "image/png"),
+        (b"\xff\xd8", "image/png"),
+        (b"", "image/png"),
+    ],
+)
+def test_sniff_mime(data, mime):
+    """根据魔数识别图像格式,无法识别时按 PNG 处理"""
+    assert client._sniff_mime(data) == mime
+
+
+def test_encode_image_bytes():
+    """内存中的图像数据编码为带正确前缀的 data URL"""
+    data = JPEG_HEADER + bytes(range(256))
+    expected = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+    assert client._encode_image_bytes(data) == expected
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 5, 11, 12, 13, 100])
+def test_encode_image_file(tmp_path, monkeypatch, size):
+    """分块编码的结果与整体编码一致,包括空文件和长度不是 3 的倍数的文件"""
+    # 使用较小的分块,覆盖跨块拼接的情况
+    monkeypatch.setattr(client, "_ENCODE_CHUNK_SIZE", 6)
+    data = (PNG_HEADER + bytes(range(256)))[:size]
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(data)
+
+    expected = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+    assert client._encode_image_file(str(image_path)) == expected
+
+
+@pytest.mark.parametrize("reported_size", [0, 10, 500])
+def test_encode_image_file_size_changed(tmp_path, monkeypatch, reported_size):
+    """读取期间文件大小发生变化时,预分配的缓冲区仍能得到正确结果"""
+    # fstat 返回的大小与实际读取到的内容不一致
+    data = JPEG_HEADER + bytes(range(100))
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(data)
+    monkeypatch.setattr(
+        client.os, "fstat", lambda fd: types.SimpleNamespace(st_size=reported_size)
+    )
+
+    expected = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+    assert client._encode_image_file(str(image_path)) == expected
+
+
+def test_iter_sse_chunks():
+    """跳过非数据行,兼容 data: 后无空格的写法,遇到 [DONE] 时结束"""
+    lines = [
+        ": keep-alive",
+        "",
+        'data: {"choices": [{"delta": {"content": "你"}}]}',
+        "event: message",
+        'data:{"choices": [{"delta": {"content": "好"}}]}',
+        'data: {"choices": [], "usage": {"total_tokens": 3}}',
+        "data: [DONE]",
+        'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+    ]
+    assert list(client._iter_sse_chunks(lines)) == [
+        {"choices": [{"delta": {"content": "你"}}]},
+        {"choices": [{"delta": {"content": "好"}}]},
+        {"choices": [], "usage": {"total_tokens": 3}},
+    ]
+
+
+def test_iter_sse_chunks_without_done():
+    """流在没有 [DONE] 的情况下结束"""
+    lines = ['data: {"choices": []}']
+    assert list(client._iter_sse_chunks(lines)) == [{"choices": []}]
+
+
+def test_iter_sse_chunks_error():
+    """流中出现 error 时抛出 ValueError"""
+    lines = [
+        'data: {"choices": [{"delta": {"content": "a"}}]}',
+        'data: {"error": {"message": "rate limited"}}',
+    ]
+    chunks = client._iter_sse_chunks(lines)
+    assert next(chunks) == {"choices": [{"delta": {"content": "a"}}]}
+    with pytest.raises(ValueError, match="rate limited"):
+        next(chunks)
+
+
+class _StubCache:
+    """只实现精确匹配的内存缓存"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, prompt, system_prompt):
+        """查找缓存的回答"""
+        return self.store.get((system_prompt, prompt))
+
+    def set(self, prompt, system_prompt, response):
+        """保存回答"""
+        self.store[(system_prompt, prompt)] = response
+
+
+def test_atext_completion_uses_cache(monkeypatch):
+    """异步文本请求与同步请求一样读写缓存"""
+    cache = _StubCache()
+    monkeypatch.setattr(client, "get_cache", lambda: cache)
+    ai_client = client.AIClient(api_key="key", base_url="http://localhost", model="m")
+    calls = []
+
+    async def fake_achat_completion(messages, **_):
+        calls.append(messages)
+        return {"choices": [{"message": {"content": "回答"}}]}
+
+    monkeypatch.setattr(ai_client, "achat_completion", fake_achat_completion)
+
+    for _ in range(2):
+        response = asyncio.run(
+            ai_client.atext_completion("问题", system_prompt="系统", stream=False)
+        )
+        assert response == "回答"
+    assert len(calls) == 1
+    assert cache.store == {("系统", "问题"): "回答"}
+
+
+def _stream_chunks(count):
+    """生成 count 个内容片段,最后附带使用情况统计"""
+    for i in range(count):
+        yield {"choices": [{"delta": {"content": str(i % 10)}}]}
+    yield {
+        "choices": [],
+        "usage": {"prompt_tokens": 3, "completion_tokens": count, "total_tokens": count + 3},
+    }
+
+
+def _record_writes(monkeypatch):
+    """记录每次写出的片段数"""
+    writes = []
+    write_out = client._write_out
+
+    def recording_write_out(pending):
+        if pending:
+            writes.append(len(pending))
+        write_out(pending)
+
+    monkeypatch.setattr(client, "_write_out", recording_write_out)
+    return writes
+
+
+def test_process_stream_batches_by_count(monkeypatch, capsys):
+    """时间不推进时,积压片段超过上限才写出,结束时写出剩余片段"""
+    monkeypatch.setattr(client.time, "monotonic", lambda: 0.0)
+    writes = _record_writes(monkeypatch)
+    ai_client = client.AIClient(api_key="key", base_url="http://localhost", model="m")
+
+    response = ai_client.process_stream(_stream_chunks(70))
+
+    expected = "".join(str(i % 10) for i in range(70))
+    assert response == expected
+    limit = client._FLUSH_MAX_PENDING + 1
+    assert writes == [limit, limit, 70 - 2 * limit]
+    out = capsys.readouterr().out
+    assert out.startswith(expected)
+    assert "提问: 3 tokens" in out
+    assert "总长度: 73 tokens" in out
+
+
+def test_process_stream_flushes_by_interval(monkeypatch, capsys):
+    """距上次写出超过间隔时立即写出"""
+    ticks = iter(range(100))
+    monkeypatch.setattr(client.time, "monotonic", lambda: float(next(ticks)))
+    writes = _record_writes(monkeypatch)
+    ai_client = client.AIClient(api_key="key", base_url="http://localhost", model="m")
+
+    ai_client.process_stream(_stream_chunks(5))
+
+    assert writes == [1, 1, 1, 1, 1]
+    assert capsys.readouterr().out.startswith("01234")
+
+
+def test_process_stream_without_output(monkeypatch, capsys):
+    """不打印输出时不写出任何片段"""
+    writes = _record_writes(monkeypatch)
+    ai_client = client.AIClient(api_key="key", base_url="http://localhost", model="m")
+
+    assert ai_client.process_stream(_stream_chunks(5), print_output=False) == "01234"
+    assert not writes
+    assert capsys.readouterr().out == ""